@@ -1,7 +1,9 @@
 # --- Imports ---------------------------------------------------------------
-import io
+import os
 import re
 import json
+import time
+import hashlib
 import streamlit as st
 from google import genai
 from google.genai import types
@@ -14,12 +16,27 @@ if not API_KEY:
     st.warning("⚠️ 'GEMINI_API_KEY' is not set in st.secrets. Add it before deploying.")
     st.stop()
 
-client = genai.Client(api_key=API_KEY)
+@st.cache_resource(show_spinner=False)
+def get_client(api_key: str) -> genai.Client:
+    """One Gemini client (and its HTTP connection pool) per process, not per rerun."""
+    return genai.Client(api_key=api_key)
+
+client = get_client(API_KEY)
 
 # --- Identity / System Instructions ----------------------------------------
-def load_identity() -> str:
+IDENTITY_PATH = "identity.txt"
+
+def identity_mtime():
+    """Modification time of identity.txt (None if missing); keys the identity cache."""
+    try:
+        return os.path.getmtime(IDENTITY_PATH)
+    except OSError:
+        return None
+
+@st.cache_data(show_spinner=False)
+def load_identity(mtime=None) -> str:
     try:
-        with open("identity.txt") as f:
+        with open(IDENTITY_PATH) as f:
             return f.read()
     except FileNotFoundError:
         return (
@@ -28,78 +45,255 @@ def load_identity() -> str:
             "cover letter ends [END_LATEX_COVER]."
         )
 
-SYSTEM_INSTRUCTIONS = load_identity()
+SYSTEM_INSTRUCTIONS = load_identity(identity_mtime())
+
+# Character budgets for text sent to Gemini (input tokens dominate latency).
+# The tailor prompt always gets the full resume, which is its source of truth.
+SCORE_CONTEXT_CHARS = 6000
+TAILOR_CONTEXT_CHARS = 12000
+
+# Minimum seconds between redraws of a streaming LaTeX block
+STREAM_FLUSH_S = 0.05
 
 # --- Helpers ---------------------------------------------------------------
-def parse_resume_file(uploaded_file) -> str:
-    """Extract text from PDF, DOCX, or TXT file."""
+def _pdf_text(f) -> str:
+    reader = PyPDF2.PdfReader(f)
+    text = ""
+    for p in reader.pages:
+        try:
+            text += p.extract_text() or ""
+        except Exception:
+            pass
+    return text
+
+def _docx_text(f) -> str:
+    docf = docx.Document(f)
+    return "\n".join(para.text for para in docf.paragraphs)
+
+def _plain_text(f) -> str:
+    with f.getbuffer() as buf:
+        return str(buf, "utf-8", "ignore")
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT_EXTRACTORS = {
+    "application/pdf": _pdf_text,
+    DOCX_MIME: _docx_text,
+}
+
+def sniff_mime(uploaded_file) -> str:
+    """Detect PDF/DOCX from magic bytes; browsers often report DOCX as octet-stream."""
+    with uploaded_file.getbuffer() as buf:
+        head = bytes(buf[:4])
+    if head == b"%PDF":
+        return "application/pdf"
+    if head == b"PK\x03\x04":
+        return DOCX_MIME
+    return "text/plain"
+
+def file_digest(uploaded_file) -> str:
+    """blake2b digest of an upload, hashed from its buffer without copying."""
+    with uploaded_file.getbuffer() as buf:
+        return hashlib.blake2b(buf, digest_size=16).hexdigest()
+
+# Bounded and short-lived: the cache is process-wide, so uploads from other
+# sessions must not linger in server memory.
+@st.cache_data(show_spinner=False, max_entries=32, ttl=600)
+def _extract_text(digest: str, mime: str, _file) -> str:
+    """Parse an upload once per distinct content (keyed by its digest)."""
+    # UploadedFile is already an in-memory BytesIO; hand it to the parsers
+    # directly instead of copying it into a second buffer.
+    _file.seek(0)
+    return TEXT_EXTRACTORS.get(mime, _plain_text)(_file)
+
+def parse_resume_file(uploaded_file, digest: str = None) -> str:
+    """Extract text from PDF, DOCX, or TXT file (pass `digest` if already computed)."""
     try:
-        if uploaded_file.type == "application/pdf":
-            reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
-            text = ""
-            for p in reader.pages:
-                try:
-                    text += p.extract_text() or ""
-                except Exception:
-                    pass
-            return text
-        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            docf = docx.Document(io.BytesIO(uploaded_file.read()))
-            return "\n".join(para.text for para in docf.paragraphs)
-        else:
-            return uploaded_file.read().decode("utf-8", errors="ignore")
+        digest = digest or file_digest(uploaded_file)
+        return _extract_text(digest, sniff_mime(uploaded_file), uploaded_file)
     except Exception as e:
         st.error(f"Error parsing file: {e}")
         return ""
 
-def call_gemini(prompt: str, temperature: float = 0.5) -> str:
+MODEL_NAME = "gemini-2.0-flash-exp"
+
+@st.cache_resource(show_spinner=False)
+def gen_config(system_instruction: str, temperature: float, max_output_tokens: int,
+               json_fields: tuple = (), stop_sequences: tuple = ()) -> types.GenerateContentConfig:
+    """Generation config, built once per distinct settings (JSON of int `json_fields` if given)."""
+    schema = None
+    if json_fields:
+        schema = types.Schema(
+            type=types.Type.OBJECT,
+            properties={k: types.Schema(type=types.Type.INTEGER) for k in json_fields},
+            required=list(json_fields),
+        )
+    return types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        temperature=temperature,
+        max_output_tokens=max_output_tokens,
+        response_mime_type="application/json" if schema else None,
+        response_schema=schema,
+        stop_sequences=list(stop_sequences) or None,
+    )
+
+def call_gemini(prompt: str, temperature: float = 0.5, max_output_tokens: int = 8192,
+                json_fields: tuple = ()) -> str:
     """Call Gemini with system instructions."""
     try:
-        cfg = types.GenerateContentConfig(
-            system_instruction=SYSTEM_INSTRUCTIONS,
-            temperature=temperature,
-            max_output_tokens=8000,
-        )
         resp = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
+            model=MODEL_NAME,
             contents=[types.Content(parts=[types.Part(text=prompt)])],
-            config=cfg,
+            config=gen_config(SYSTEM_INSTRUCTIONS, temperature, max_output_tokens, json_fields),
         )
         return resp.text or ""
     except Exception as e:
         st.error(f"Gemini API error: {e}")
         return ""
 
+def stream_gemini(prompt: str, temperature: float = 0.5, max_output_tokens: int = 8192,
+                  stop_sequences: tuple = ()):
+    """Yield Gemini response chunks as they are generated; errors are shown, then re-raised."""
+    try:
+        yield from client.models.generate_content_stream(
+            model=MODEL_NAME,
+            contents=[types.Content(parts=[types.Part(text=prompt)])],
+            config=gen_config(SYSTEM_INSTRUCTIONS, temperature, max_output_tokens,
+                              stop_sequences=stop_sequences),
+        )
+    except Exception as e:
+        st.error(f"Gemini API error: {e}")
+        raise
+
+def stream_latex(slot, prompt: str, marker: str, temperature: float = 0.6, status: str = ""):
+    """Render a streamed LaTeX response into `slot`; return (text cut at `marker`, completed).
+
+    `status` is shown in the slot only until the first chunk replaces it.
+    """
+    # The model stops server-side at the marker; case variants the exact-match
+    # stop sequence misses end the stream here instead of running to the cap.
+    if status:
+        slot.info(f"⏳ {status}")
+    marker_lc = marker.lower()
+    text = ""
+    finish = None
+    hit_marker = failed = False
+    last_flush = time.monotonic()
+    try:
+        for chunk in stream_gemini(prompt, temperature=temperature, stop_sequences=(marker,)):
+            if chunk.candidates and chunk.candidates[0].finish_reason:
+                finish = chunk.candidates[0].finish_reason
+            piece = chunk.text or ""
+            if not piece:
+                continue
+            text += piece
+            # Redraw at most every STREAM_FLUSH_S; each st.code re-sends the whole block.
+            now = time.monotonic()
+            if now - last_flush >= STREAM_FLUSH_S:
+                slot.code(text, language="latex")
+                last_flush = now
+            if marker_lc in text[-(len(piece) + len(marker)):].lower():
+                hit_marker = True
+                break
+    except Exception:
+        failed = True  # already reported by stream_gemini
+    text = until_marker(text, marker)
+    slot.code(text, language="latex")
+    # Only a non-empty stream that ended cleanly counts as a finished document.
+    ended = hit_marker or (not failed and finish == types.FinishReason.STOP)
+    complete = ended and bool(text.strip())
+    if complete or failed:  # errors were already reported by stream_gemini
+        pass
+    elif ended:
+        st.warning("⚠️ Gemini returned an empty response. Try again.")
+    elif finish == types.FinishReason.MAX_TOKENS:
+        st.warning("⚠️ Output hit the token limit and may be incomplete. Try again or shorten the inputs.")
+    else:
+        st.warning(f"⚠️ Generation stopped early ({getattr(finish, 'name', finish)}); output may be incomplete. Try again.")
+    return text, complete
+
+_FENCED_JSON_RE = re.compile(r'```(?:json)?\s*(\{.*?\}|\[.*?\])\s*```', re.DOTALL)
+_BARE_JSON_RE = re.compile(r'(\{.*?\}|\[.*?\])', re.DOTALL)
+
 def extract_json(text: str):
     """Extract first valid JSON object/array from text."""
+    # Schema-constrained replies are bare JSON; only scan with regexes if that fails.
+    stripped = text.strip()
+    if stripped[:1] in ("{", "["):
+        try:
+            return json.loads(stripped)
+        except ValueError:
+            pass
     try:
-        m = re.search(r'```(?:json)?\s*(\{.*?\}|\[.*?\])\s*```', text, re.DOTALL)
+        m = _FENCED_JSON_RE.search(text)
         if m:
             return json.loads(m.group(1))
-        m = re.search(r'(\{.*?\}|\[.*?\])', text, re.DOTALL)
+        m = _BARE_JSON_RE.search(text)
         if m:
             return json.loads(m.group(1))
         return json.loads(text)
     except Exception:
         return None
 
+_TEX_ESCAPES = {
+    '\\': r'\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$',
+    '#': r'\#', '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}'
+}
+_TEX_SPECIALS_RE = re.compile(r'[\\&%$#_{}~^]')
+
 def escape_tex(s: str) -> str:
     """Escape LaTeX special characters in user-supplied header fields."""
     if not s:
         return ""
-    repl = {
-        '\\': r'\\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$',
-        '#': r'\#', '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}',
-        '^': r'\textasciicircum{}'
-    }
-    for k, v in repl.items():
-        s = s.replace(k, v)
-    return s
+    # Single pass, so replacements are never re-escaped by later rules.
+    return _TEX_SPECIALS_RE.sub(lambda m: _TEX_ESCAPES[m.group()], s)
+
+def escape_fields(fields: dict) -> dict:
+    """Escape every user-supplied header field in one pass for prompt formatting."""
+    return {k: escape_tex(v) for k, v in fields.items()}
+
+_NEWLINE_RE = re.compile(r'\r\n?')
+_HSPACE_RE = re.compile(r'[ \t\xa0]+')
+_LINE_EDGE_RE = re.compile(r' ?\n ?')
+_BLANK_RUN_RE = re.compile(r'\n{3,}')
+
+def compact_text(text: str) -> str:
+    """Collapse extraction whitespace so resume/JD text costs fewer input tokens."""
+    text = _NEWLINE_RE.sub("\n", text)
+    text = _HSPACE_RE.sub(" ", text)
+    text = _LINE_EDGE_RE.sub("\n", text)
+    return _BLANK_RUN_RE.sub("\n\n", text).strip()
+
+def clip_text(text: str, limit: int) -> str:
+    """Cut text to a character budget, backing off to the last line break."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut] if cut > limit // 2 else text[:limit]
+
+def content_key(*texts: str) -> str:
+    """Stable digest of the texts a Gemini response depends on (cache key)."""
+    h = hashlib.sha256()
+    for t in texts:
+        h.update((t or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+RESUME_END_MARKER = "[END_LATEX_RESUME]"
+COVER_END_MARKER = "[END_LATEX_COVER]"
+_MARKER_RES = {
+    m: re.compile(re.escape(m), re.IGNORECASE) for m in (RESUME_END_MARKER, COVER_END_MARKER)
+}
 
 def until_marker(text: str, marker: str) -> str:
-    """Keep output up to and including a marker, if present."""
-    parts = re.split(re.escape(marker), text, flags=re.IGNORECASE)
-    return (parts[0] + marker) if len(parts) > 1 else text
+    """Keep output before a marker (dropping the marker itself), if present."""
+    # One case-insensitive search, so the first occurrence in any case wins. The
+    # server already strips an exact-case marker; drop case variants to match.
+    pattern = _MARKER_RES.get(marker) or re.compile(re.escape(marker), re.IGNORECASE)
+    m = pattern.search(text)
+    if not m:
+        return text
+    return text[:m.start()].rstrip()
 
 # --- Prompts ---------------------------------------------------------------
 SCORE_PROMPT_TMPL = """Return ONLY a JSON object with the fields below (0–100 integers).
@@ -122,6 +316,8 @@ Return:
 }}
 """
 
+SCORE_FIELDS = ("overall_score", "skills_fit", "experience_fit", "education_fit", "ats_keywords_coverage")
+
 # NOTE: We do NOT place LaTeX braces in this format string.
 #       We inject the LaTeX template as a variable so { } in LaTeX never
 #       collide with Python .format placeholders.
@@ -261,14 +457,27 @@ if 'master_resume' not in st.session_state:
     st.session_state.master_resume = None
 if 'master_resume_name' not in st.session_state:
     st.session_state.master_resume_name = None
+if 'resume_key' not in st.session_state:
+    st.session_state.resume_key = None
+if 'resume_file_id' not in st.session_state:
+    st.session_state.resume_file_id = None
+if 'resume_file_digest' not in st.session_state:
+    st.session_state.resume_file_digest = None
 if 'current_jd' not in st.session_state:
     st.session_state.current_jd = None
+if 'jd_key' not in st.session_state:
+    st.session_state.jd_key = None
 if 'scores' not in st.session_state:
     st.session_state.scores = {}
 if 'tailored_latex' not in st.session_state:
     st.session_state.tailored_latex = None
 if 'header' not in st.session_state:
     st.session_state.header = {}
+if 'score_cache' not in st.session_state:
+    st.session_state.score_cache = {}
+
+# Bind once per rerun; the header dict is mutated in place by the forms below.
+header = st.session_state.header
 
 # --- Page ------------------------------------------------------------------
 st.set_page_config(page_title="ReadysetRole — LaTeX ATS Tailor", page_icon="⚡", layout="wide")
@@ -281,11 +490,21 @@ c1, c2 = st.columns(2)
 
 with c1:
     up_res = st.file_uploader("Master Resume", type=["pdf", "docx", "txt"], key="resume_uploader")
-    if up_res and st.session_state.master_resume is None:
-        txt = parse_resume_file(up_res)
+    # file_id changes only on a new upload, so plain reruns skip hashing; a new
+    # upload is hashed once, and re-uploading the same content skips parsing.
+    if up_res and up_res.file_id != st.session_state.resume_file_id:
+        st.session_state.resume_file_id = up_res.file_id
+        up_digest = file_digest(up_res)
+    else:
+        up_digest = None
+    if up_digest and up_digest != st.session_state.resume_file_digest:
+        st.session_state.resume_file_digest = up_digest
+        txt = parse_resume_file(up_res, up_digest)
         if txt.strip():
-            st.session_state.master_resume = txt
+            st.session_state.master_resume = compact_text(txt)
+            st.session_state.resume_key = content_key(st.session_state.master_resume)
             st.session_state.master_resume_name = up_res.name
+            st.session_state.tailored_latex = None
             st.success("✅ Resume loaded")
     if st.session_state.master_resume_name:
         st.info(f"📄 {st.session_state.master_resume_name}")
@@ -293,18 +512,24 @@ with c1:
 with c2:
     jd_mode = st.radio("Job Description", ["Paste Text", "Upload File"], horizontal=True)
     if jd_mode == "Paste Text":
-        jd_txt = st.text_area("Paste JD", height=160, label_visibility="collapsed", key="jd_textarea")
-        if st.button("Compute % Match (QuickScore)", use_container_width=True):
+        # Form: editing the JD does not rerun the script until it is submitted.
+        with st.form("jd_paste_form", border=False):
+            jd_txt = st.text_area("Paste JD", height=160, label_visibility="collapsed", key="jd_textarea")
+            jd_submit = st.form_submit_button("Compute % Match (QuickScore)", use_container_width=True)
+        if jd_submit:
+            jd_txt = compact_text(jd_txt or "")
             if jd_txt and st.session_state.master_resume:
                 st.session_state.current_jd = jd_txt
+                st.session_state.jd_key = content_key(st.session_state.current_jd)
             else:
                 st.warning("Please upload both resume and JD first.")
     else:
         up_jd = st.file_uploader("Upload JD", type=["pdf", "docx", "txt"], key="jd_uploader")
         if up_jd and st.button("Compute % Match (QuickScore)", use_container_width=True):
-            jd_txt = parse_resume_file(up_jd)
+            jd_txt = compact_text(parse_resume_file(up_jd))
             if jd_txt and st.session_state.master_resume:
                 st.session_state.current_jd = jd_txt
+                st.session_state.jd_key = content_key(st.session_state.current_jd)
             else:
                 st.warning("Please upload both resume and JD first.")
 
@@ -312,14 +537,22 @@ st.divider()
 
 # --- QuickScore ------------------------------------------------------------
 if st.session_state.master_resume and st.session_state.current_jd:
-    with st.spinner("Scoring..."):
-        prompt = SCORE_PROMPT_TMPL.format(
-            resume=st.session_state.master_resume[:6000],
-            jd=st.session_state.current_jd[:6000]
-        )
-        raw = call_gemini(prompt, temperature=0.2)
-        scores = extract_json(raw) or {}
-        st.session_state.scores = scores
+    # Every widget interaction reruns this script; only hit Gemini for a
+    # resume/JD pair that has not been scored yet in this session.
+    score_key = content_key(st.session_state.resume_key, st.session_state.jd_key)
+    scores = st.session_state.score_cache.get(score_key)
+    if scores is None:
+        with st.spinner("Scoring..."):
+            prompt = SCORE_PROMPT_TMPL.format(
+                resume=clip_text(st.session_state.master_resume, SCORE_CONTEXT_CHARS),
+                jd=clip_text(st.session_state.current_jd, SCORE_CONTEXT_CHARS)
+            )
+            raw = call_gemini(prompt, temperature=0.2, max_output_tokens=256,
+                              json_fields=SCORE_FIELDS)
+            scores = extract_json(raw) or {}
+            if scores:
+                st.session_state.score_cache[score_key] = scores
+    st.session_state.scores = scores
 
     s = st.session_state.scores or {}
     A, B, C, D, E = st.columns(5)
@@ -334,46 +567,45 @@ if st.session_state.master_resume and st.session_state.current_jd:
     # --- Header fields for LaTeX resume -----------------------------------
     with st.form("latex_header_form"):
         st.subheader("👤 Header (Resume LaTeX)")
-        name = st.text_input("Name", value=st.session_state.header.get("name", ""))
-        location = st.text_input("Location", value=st.session_state.header.get("location", ""))
-        phone = st.text_input("Phone", value=st.session_state.header.get("phone", ""))
-        email = st.text_input("Email", value=st.session_state.header.get("email", ""))
-        portfolio_url = st.text_input("Portfolio URL", value=st.session_state.header.get("portfolio_url", ""))
-        portfolio_label = st.text_input("Portfolio Label", value=st.session_state.header.get("portfolio_label", ""))
-        linkedin_url = st.text_input("LinkedIn URL", value=st.session_state.header.get("linkedin_url", ""))
-        linkedin_label = st.text_input("LinkedIn Label", value=st.session_state.header.get("linkedin_label", ""))
+        name = st.text_input("Name", value=header.get("name", ""))
+        location = st.text_input("Location", value=header.get("location", ""))
+        phone = st.text_input("Phone", value=header.get("phone", ""))
+        email = st.text_input("Email", value=header.get("email", ""))
+        portfolio_url = st.text_input("Portfolio URL", value=header.get("portfolio_url", ""))
+        portfolio_label = st.text_input("Portfolio Label", value=header.get("portfolio_label", ""))
+        linkedin_url = st.text_input("LinkedIn URL", value=header.get("linkedin_url", ""))
+        linkedin_label = st.text_input("LinkedIn Label", value=header.get("linkedin_label", ""))
         generate_resume = st.form_submit_button("🎯 Generate LaTeX Resume", type="primary", use_container_width=True)
 
     if generate_resume:
         # persist header values
-        st.session_state.header.update({
+        header.update({
             "name": name, "location": location, "phone": phone, "email": email,
             "portfolio_url": portfolio_url, "portfolio_label": portfolio_label,
             "linkedin_url": linkedin_url, "linkedin_label": linkedin_label
         })
 
-        # escape TeX
-        name_e = escape_tex(name)
-        location_e = escape_tex(location)
-        phone_e = escape_tex(phone)
-        email_e = escape_tex(email)
-        portfolio_url_e = escape_tex(portfolio_url)
-        portfolio_label_e = escape_tex(portfolio_label)
-        linkedin_url_e = escape_tex(linkedin_url)
-        linkedin_label_e = escape_tex(linkedin_label)
-
-        with st.spinner("Tailoring LaTeX resume..."):
-            tailor_prompt = TAILOR_LATEX_PROMPT_TMPL.format(
-                LATEX_RESUME_TEMPLATE=LATEX_RESUME_TEMPLATE,
-                name=name_e, location=location_e, phone=phone_e, email=email_e,
-                portfolio_url=portfolio_url_e, portfolio_label=portfolio_label_e,
-                linkedin_url=linkedin_url_e, linkedin_label=linkedin_label_e,
-                resume=st.session_state.master_resume,
-                jd=st.session_state.current_jd
-            )
-            latex_resume = call_gemini(tailor_prompt, temperature=0.6)
-            latex_resume = until_marker(latex_resume, "[END_LATEX_RESUME]")
-            st.session_state.tailored_latex = latex_resume
+        jd_ctx = clip_text(st.session_state.current_jd, TAILOR_CONTEXT_CHARS)
+        if len(jd_ctx) < len(st.session_state.current_jd):
+            st.info(f"ℹ️ Job description shortened to its first {len(jd_ctx):,} characters for tailoring.")
+
+        tailor_prompt = TAILOR_LATEX_PROMPT_TMPL.format(
+            LATEX_RESUME_TEMPLATE=LATEX_RESUME_TEMPLATE,
+            **escape_fields(header),
+            resume=st.session_state.master_resume,
+            jd=jd_ctx
+        )
+        # Stream into a temporary slot (no spinner: the text itself shows progress);
+        # the section below renders the final copy. An incomplete draft stays in
+        # the slot next to its warning and never replaces the stored resume, which
+        # is also the cover letter's factual context.
+        slot = st.empty()
+        latex, complete = stream_latex(
+            slot, tailor_prompt, RESUME_END_MARKER, status="Tailoring LaTeX resume..."
+        )
+        if complete:
+            st.session_state.tailored_latex = latex
+            slot.empty()
 
 # --- Tailored Resume (LaTeX) -----------------------------------------------
 if st.session_state.tailored_latex:
@@ -384,48 +616,30 @@ if st.session_state.tailored_latex:
     st.subheader("✉️ Optional: LaTeX Cover Letter")
 
     with st.form("cover_form"):
-        company = st.text_input("Company", value=st.session_state.header.get("company", ""))
-        role = st.text_input("Role / Position", value=st.session_state.header.get("role", ""))
-        receiver = st.text_input("Receiver (e.g., Hiring Manager \\\\ Company)", value=st.session_state.header.get("receiver", "Hiring Manager"))
-        greeting = st.text_input("Greeting (Dear ___,)", value=st.session_state.header.get("greeting", "Hiring Manager"))
-        sender_title = st.text_input("Sender Title (under \\name{})", value=st.session_state.header.get("sender_title", "Applicant"))
-        sender_city = st.text_input("Sender City", value=st.session_state.header.get("sender_city", ""))
-        sender_phone = st.text_input("Sender Phone", value=st.session_state.header.get("sender_phone", ""))
-        sender_email = st.text_input("Sender Email", value=st.session_state.header.get("sender_email", ""))
-        notes = st.text_area("Optional notes to emphasize (kept factual)", value=st.session_state.header.get("notes", ""), height=100)
+        company = st.text_input("Company", value=header.get("company", ""))
+        role = st.text_input("Role / Position", value=header.get("role", ""))
+        receiver = st.text_input("Receiver (e.g., Hiring Manager \\\\ Company)", value=header.get("receiver", "Hiring Manager"))
+        greeting = st.text_input("Greeting (Dear ___,)", value=header.get("greeting", "Hiring Manager"))
+        sender_title = st.text_input("Sender Title (under \\name{})", value=header.get("sender_title", "Applicant"))
+        sender_city = st.text_input("Sender City", value=header.get("sender_city", ""))
+        sender_phone = st.text_input("Sender Phone", value=header.get("sender_phone", ""))
+        sender_email = st.text_input("Sender Email", value=header.get("sender_email", ""))
+        notes = st.text_area("Optional notes to emphasize (kept factual)", value=header.get("notes", ""), height=100)
         gen_cover = st.form_submit_button("Generate LaTeX Cover Letter", use_container_width=True)
 
     if gen_cover:
         # persist fields
-        st.session_state.header.update({
+        header.update({
             "company": company, "role": role, "receiver": receiver, "greeting": greeting,
             "sender_title": sender_title, "sender_city": sender_city,
             "sender_phone": sender_phone, "sender_email": sender_email, "notes": notes
         })
 
-        # escape
-        name_e = escape_tex(st.session_state.header.get("name", ""))
-        receiver_e = escape_tex(receiver)
-        greeting_e = escape_tex(greeting)
-        sender_title_e = escape_tex(sender_title)
-        sender_city_e = escape_tex(sender_city)
-        sender_phone_e = escape_tex(sender_phone)
-        sender_email_e = escape_tex(sender_email)
-        company_e = escape_tex(company)
-        role_e = escape_tex(role)
-        notes_e = escape_tex(notes)
-
-        with st.spinner("Drafting LaTeX cover letter..."):
-            cl_prompt = COVER_LETTER_LATEX_PROMPT_TMPL.format(
-                LATEX_LETTER_TEMPLATE=LATEX_LETTER_TEMPLATE,
-                name=name_e, sender_title=sender_title_e,
-                receiver=receiver_e, greeting=greeting_e,
-                sender_city=sender_city_e, sender_phone=sender_phone_e, sender_email=sender_email_e,
-                company=company_e, role=role_e, notes=notes_e,
-                tailored_resume=st.session_state.tailored_latex
-            )
-            latex_cover = call_gemini(cl_prompt, temperature=0.6)
-            latex_cover = until_marker(latex_cover, "[END_LATEX_COVER]")
-            st.code(latex_cover, language="latex")
+        cl_prompt = COVER_LETTER_LATEX_PROMPT_TMPL.format(
+            LATEX_LETTER_TEMPLATE=LATEX_LETTER_TEMPLATE,
+            **escape_fields({"name": "", **header}),
+            tailored_resume=st.session_state.tailored_latex
+        )
+        stream_latex(st.empty(), cl_prompt, COVER_END_MARKER, status="Drafting LaTeX cover letter...")
 
 st.caption("ReadysetRole — LaTeX-first ATS Tailoring (no fabrication)")